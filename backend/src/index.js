@@ -18,6 +18,7 @@ const agronomistRoutes = require('./routes/agronomist');
 const adminRoutes = require('./routes/admin');
 
 const { initializeDatabase } = require('./config/database');
+const aiService = require('./services/ai');
 const { errorHandler } = require('./middleware/errorHandler');
 const { 
   requestLogger, 
@@ -152,20 +153,30 @@ async function startServer() {
 }
 
 // Graceful shutdown
+const SHUTDOWN_TIMEOUT = 10000;
+
+// Let the preprocessing workers finish their in-flight images, but exit
+// anyway if one of them does not stop in time
+const exitAfterCleanup = () => {
+  const deadline = new Promise((resolve) => setTimeout(resolve, SHUTDOWN_TIMEOUT).unref());
+  Promise.race([aiService.shutdown(), deadline])
+    .catch((error) => logger.error('Error during shutdown', { error: error.message }))
+    // eslint-disable-next-line no-process-exit
+    .finally(() => process.exit(0));
+};
+
 process.on('SIGTERM', () => {
   logger.info('SIGTERM received, shutting down gracefully');
   appLogger.systemEvent('server_shutdown', { signal: 'SIGTERM' });
   console.log('🛑 SIGTERM received, shutting down gracefully');
-  // eslint-disable-next-line no-process-exit
-  process.exit(0);
+  exitAfterCleanup();
 });
 
 process.on('SIGINT', () => {
   logger.info('SIGINT received, shutting down gracefully');
   appLogger.systemEvent('server_shutdown', { signal: 'SIGINT' });
   console.log('🛑 SIGINT received, shutting down gracefully');
-  // eslint-disable-next-line no-process-exit
-  process.exit(0);
+  exitAfterCleanup();
 });
 
 startServer();
\ No newline at end of file
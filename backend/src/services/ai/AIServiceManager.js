@@ -409,6 +409,13 @@ class AIServiceManager {
     logger.info('AI service cache cleared', { category: 'ai-service' });
   }
 
+  /**
+   * Stop the preprocessing workers
+   */
+  async shutdown() {
+    await this.preprocessingService.stopWorkers();
+  }
+
   /**
    * Enable/disable provider
    */
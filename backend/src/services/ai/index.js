@@ -269,6 +269,13 @@ class AIService {
     }
   }
 
+  /**
+   * Release AI service resources before the process exits
+   */
+  async shutdown() {
+    await this.manager.shutdown();
+  }
+
   /**
    * Get combined capabilities from all providers
    */
@@ -0,0 +1,204 @@
+"""
+CropGuard GPU Preprocessing Backend
+Runs the crop image preprocessing pipeline on CUDA with NVIDIA DALI
+"""
+
+import threading
+from typing import Dict, List, Tuple, Any
+
+import numpy as np
+import cv2
+
+# NVIDIA DALI is optional and only needed for the 'cuda_dali' backend
+try:
+    from nvidia.dali import fn, types
+    from nvidia.dali.pipeline import Pipeline
+    DALI_AVAILABLE = True
+except ImportError:
+    DALI_AVAILABLE = False
+
+# Gray-world white balance strength, matching the CPU pipeline
+COLOR_CORRECTION_STRENGTH = 0.3
+
+# Tensor output precisions (DALI has no bfloat16 type)
+TENSOR_DTYPES = ('float16', 'float32')
+
+def _to_host(tensor_list):
+    """Copy a DALI TensorList to host memory if it lives on the GPU"""
+    return tensor_list.as_cpu() if hasattr(tensor_list, 'as_cpu') else tensor_list
+
+class DALIPreprocessor:
+    """
+    GPU implementation of the preprocessing pipeline
+
+    Images are decoded on the GPU (nvJPEG for JPEGs), resized and center
+    cropped to the target size, white balanced, contrast enhanced, sharpened
+    and optionally denoised without leaving device memory. Auto-crop and CLAHE
+    lighting normalization have no DALI equivalent and only run on the CPU
+    backend.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        if not DALI_AVAILABLE:
+            raise ImportError("NVIDIA DALI is required for the 'cuda_dali' backend")
+
+        if config['dali_tensor_dtype'] not in TENSOR_DTYPES:
+            raise ValueError(f"Unsupported tensor dtype: {config['dali_tensor_dtype']}")
+
+        self.config = config
+        self.batch_size = int(config['dali_batch_size'])
+
+        # DALI pipelines are not thread-safe
+        self._lock = threading.Lock()
+        self._image_pipeline = self._build_pipeline(tensor_output=False)
+        self._tensor_pipeline = None
+
+    def applied_steps(self) -> List[str]:
+        """Get list of preprocessing steps the GPU pipeline applies"""
+        width, height = self.config['target_size']
+        steps = [f'gpu_resize_to_{width}x{height}']
+
+        if self.config['color_correction']:
+            steps.append('color_correction')
+
+        steps += ['contrast_enhancement', 'sharpness_enhancement']
+
+        if self.config['noise_reduction']:
+            steps.append('noise_reduction')
+
+        return steps
+
+    def process(self, encoded_images: List[bytes]) -> List[Tuple[np.ndarray, Tuple[int, int]]]:
+        """
+        Run encoded images through the GPU pipeline
+
+        Returns:
+            List of (BGR uint8 image, original (width, height)) in input order
+        """
+        results = []
+
+        with self._lock:
+            for chunk in self._chunks(encoded_images):
+                try:
+                    self._image_pipeline.feed_input('encoded', chunk)
+                    images, shapes = self._image_pipeline.run()
+                except Exception:
+                    # A failed run (e.g. an undecodable image) leaves the
+                    # pipeline unusable, so replace it before re-raising
+                    self._image_pipeline = self._build_pipeline(tensor_output=False)
+                    raise
+                images, shapes = _to_host(images), _to_host(shapes)
+
+                for index in range(len(chunk)):
+                    height, width = np.asarray(shapes.at(index))[:2]
+                    bgr = cv2.cvtColor(np.asarray(images.at(index)), cv2.COLOR_RGB2BGR)
+                    results.append((bgr, (int(width), int(height))))
+
+        return results
+
+    def to_tensors(self, encoded_images: List[bytes]) -> list:
+        """
+        Run encoded images through the GPU pipeline and keep the result on the
+        device as CHW float tensors scaled to [0, 1], ready for a co-located
+        model, skipping the JPEG re-encode entirely
+
+        Tensors are `dali_tensor_dtype` (float16 by default), written directly
+        by the normalize kernel rather than cast from float32 afterwards
+
+        Returns:
+            List of DALI TensorListGPU batches of up to `dali_batch_size` images
+        """
+        batches = []
+
+        with self._lock:
+            if self._tensor_pipeline is None:
+                self._tensor_pipeline = self._build_pipeline(tensor_output=True)
+
+            for chunk in self._chunks(encoded_images):
+                try:
+                    self._tensor_pipeline.feed_input('encoded', chunk)
+                    tensors, = self._tensor_pipeline.run()
+                except Exception:
+                    self._tensor_pipeline = None
+                    raise
+                batches.append(tensors)
+
+        return batches
+
+    def _chunks(self, encoded_images: List[bytes]):
+        """Split encoded images into pipeline-sized batches of uint8 buffers"""
+        for start in range(0, len(encoded_images), self.batch_size):
+            yield [
+                np.frombuffer(data, dtype=np.uint8)
+                for data in encoded_images[start:start + self.batch_size]
+            ]
+
+    def _build_pipeline(self, tensor_output: bool) -> 'Pipeline':
+        """Build the DALI graph mirroring the CPU pipeline steps"""
+        target_width, target_height = self.config['target_size']
+        amount = self.config['sharpness_enhancement'] - 1.0
+
+        # A device id of None runs the same graph on the CPU
+        device_id = self.config['dali_device_id']
+        if device_id is not None:
+            device_id = int(device_id)
+
+        pipeline = Pipeline(
+            batch_size=self.batch_size,
+            num_threads=int(self.config['cv_threads'] or 4),
+            device_id=device_id,
+            # Each run is fed exactly one batch, so there is nothing to prefetch
+            prefetch_queue_depth=1
+        )
+
+        with pipeline:
+            encoded = fn.external_source(name='encoded', dtype=types.UINT8)
+
+            # Decode on the GPU, honouring EXIF orientation
+            decoded = fn.decoders.image(
+                encoded, device='cpu' if device_id is None else 'mixed',
+                output_type=types.RGB, adjust_orientation=True
+            )
+            images = decoded
+
+            # Resize to cover the target, then center crop to exact size
+            images = fn.resize(images, size=[target_height, target_width],
+                               mode='not_smaller', antialias=True)
+            images = fn.crop(images, crop=[target_height, target_width])
+
+            # Gray-world white balance towards the green channel mean
+            if self.config['color_correction']:
+                means = fn.reductions.mean(images, axes=[0, 1])
+                gains = 1.0 + (means[1] / (means + 1e-6) - 1.0) * COLOR_CORRECTION_STRENGTH
+                images = fn.cast(images * gains, dtype=types.UINT8)
+
+            # Contrast around mid-grey, as the CPU lookup table does
+            images = fn.brightness_contrast(
+                images, contrast=self.config['contrast_enhancement'], contrast_center=128
+            )
+
+            # Unsharp mask
+            if amount:
+                blurred = fn.gaussian_blur(images, sigma=1.0)
+                images = fn.cast(images * (1.0 + amount) - blurred * amount, dtype=types.UINT8)
+
+            # Light denoise
+            if self.config['noise_reduction']:
+                images = fn.gaussian_blur(images, window_size=3)
+
+            if tensor_output:
+                # Every step above runs on uint8, so only this kernel's output
+                # precision changes with dali_tensor_dtype
+                tensor_dtype = types.FLOAT16 if self.config['dali_tensor_dtype'] == 'float16' else types.FLOAT
+                pipeline.set_outputs(fn.crop_mirror_normalize(
+                    images,
+                    dtype=tensor_dtype,
+                    output_layout='CHW',
+                    mean=[0.0, 0.0, 0.0],
+                    std=[255.0, 255.0, 255.0]
+                ))
+            else:
+                pipeline.set_outputs(images, decoded.shape())
+
+        pipeline.build()
+        return pipeline
@@ -1,5 +1,6 @@
 const { spawn } = require('child_process');
 const path = require('path');
+const readline = require('readline');
 const fs = require('fs').promises;
 const { logger } = require('../../../middleware/logger');
 const { AppError } = require('../../../middleware/errorHandler');
@@ -17,9 +18,18 @@ class ImagePreprocessingService {
       processedDir: config.processedDir || path.join(__dirname, '../../../../uploads/processed'),
       timeout: config.timeout || 30000, // 30 seconds
       maxConcurrentProcessing: config.maxConcurrentProcessing || 5,
+      persistentWorker: config.persistentWorker !== false, // Reuse long-running Python processes
       ...config,
     };
 
+    // Pool of long-running Python workers (up to maxConcurrentProcessing), each
+    // handling one request at a time; the in-flight request is keyed by worker
+    this.workers = new Set();
+    this.idleWorkers = [];
+    this.workerWaiters = [];
+    this.workerRequests = new Map();
+    this.nextWorkerRequestId = 1;
+
     // Processing queue and statistics
     this.processingQueue = [];
     this.activeProcessing = 0;
@@ -206,6 +216,10 @@ class ImagePreprocessingService {
    * Process image using Python service
    */
   async processImageWithPython(inputPath, outputPath, metadata) {
+    if (this.config.persistentWorker) {
+      return this.processImageWithWorker(inputPath, outputPath, metadata);
+    }
+
     this.activeProcessing++;
     
     return new Promise((resolve, reject) => {
@@ -257,19 +271,7 @@ class ImagePreprocessingService {
             const result = JSON.parse(stdout);
             
             if (result.success) {
-              resolve({
-                success: true,
-                inputPath: result.input_path,
-                outputPath: result.output_path,
-                originalSize: result.original_size,
-                processedSize: result.processed_size,
-                processingTime: result.processing_time,
-                fileSizeBefore: result.file_size_before,
-                fileSizeAfter: result.file_size_after,
-                preprocessingApplied: result.preprocessing_applied,
-                qualityMetrics: result.quality_metrics,
-                timestamp: result.timestamp,
-              });
+              resolve(this.formatProcessorResult(result));
             } else {
               reject(new AppError(`Preprocessing failed: ${result.error}`, 500));
             }
@@ -306,6 +308,216 @@ class ImagePreprocessingService {
     });
   }
 
+  /**
+   * Process image through a long-running Python worker (--serve mode),
+   * avoiding interpreter and library start-up on every request
+   */
+  processImageWithWorker(inputPath, outputPath, metadata) {
+    this.activeProcessing++;
+
+    return new Promise((resolve, reject) => {
+      this.acquireWorker((worker) => {
+        const id = this.nextWorkerRequestId++;
+
+        const settle = (error, result) => {
+          clearTimeout(timeout);
+          this.workerRequests.delete(worker);
+          this.activeProcessing--;
+
+          if (error) {
+            reject(error);
+          } else {
+            resolve(result);
+          }
+        };
+
+        // Set timeout once the request reaches its worker; that worker is stuck
+        // on this image, so restart it alone
+        const timeout = setTimeout(() => {
+          settle(new AppError('Image preprocessing timeout', 408));
+          worker.kill('SIGTERM');
+        }, this.config.timeout);
+
+        this.workerRequests.set(worker, { id, settle });
+        worker.stdin.write(`${JSON.stringify({
+          id,
+          input: inputPath,
+          output: outputPath,
+          metadata: metadata || {},
+        })}\n`);
+      });
+    });
+  }
+
+  /**
+   * Hand an idle Python worker to the callback, starting one if the pool has
+   * room, or wait for the next worker to become free
+   */
+  acquireWorker(callback) {
+    let worker = this.idleWorkers.pop();
+
+    if (!worker && this.workers.size < this.config.maxConcurrentProcessing) {
+      worker = this.startWorker();
+    }
+
+    if (worker) {
+      callback(worker);
+    } else {
+      this.workerWaiters.push(callback);
+    }
+  }
+
+  /**
+   * Return a worker that finished its request to the pool
+   */
+  releaseWorker(worker) {
+    const waiter = this.workerWaiters.shift();
+
+    if (waiter) {
+      waiter(worker);
+    } else {
+      this.idleWorkers.push(worker);
+    }
+  }
+
+  /**
+   * Start a Python worker and add it to the pool
+   */
+  startWorker() {
+    logger.debug('Starting Python preprocessing worker', {
+      category: 'preprocessing',
+      command: this.config.pythonExecutable,
+      script: this.config.processorScript,
+      poolSize: this.workers.size + 1,
+    });
+
+    const worker = spawn(this.config.pythonExecutable, [this.config.processorScript, '--serve'], {
+      stdio: ['pipe', 'pipe', 'pipe'],
+    });
+    this.workers.add(worker);
+
+    readline.createInterface({ input: worker.stdout })
+      .on('line', (line) => this.handleWorkerResult(worker, line));
+
+    worker.stderr.on('data', (data) => {
+      logger.debug('Python worker output', {
+        category: 'preprocessing',
+        output: data.toString().trim(),
+      });
+    });
+
+    // Writes to a worker that just died are reported through 'exit' instead
+    worker.stdin.on('error', (error) => {
+      logger.warn('Failed to write to Python worker', {
+        category: 'preprocessing',
+        error: error.message,
+      });
+    });
+
+    worker.on('exit', (code, signal) => {
+      this.handleWorkerExit(worker, new AppError(
+        `Image preprocessing worker exited (code: ${code}, signal: ${signal})`, 500,
+      ));
+    });
+
+    worker.on('error', (error) => {
+      this.handleWorkerExit(worker, new AppError(
+        `Failed to start image preprocessing: ${error.message}`, 500,
+      ));
+    });
+
+    return worker;
+  }
+
+  /**
+   * Settle a worker's in-flight request from its JSON-line result and return
+   * the worker to the pool
+   */
+  handleWorkerResult(worker, line) {
+    let result;
+    try {
+      result = JSON.parse(line);
+    } catch (parseError) {
+      logger.error('Failed to parse Python worker output', {
+        category: 'preprocessing',
+        line,
+        parseError: parseError.message,
+      });
+      return;
+    }
+
+    // Ignore results for requests that already timed out
+    const request = this.workerRequests.get(worker);
+    if (!request || request.id !== result.id) {
+      return;
+    }
+
+    if (result.success) {
+      request.settle(null, this.formatProcessorResult(result));
+    } else {
+      request.settle(new AppError(`Preprocessing failed: ${result.error}`, 500));
+    }
+
+    this.releaseWorker(worker);
+  }
+
+  /**
+   * Remove a stopped worker from the pool, failing only its own in-flight
+   * request, and start a replacement if requests are waiting for a worker
+   */
+  handleWorkerExit(worker, error) {
+    // 'error' and 'exit' can both fire for the same worker
+    if (!this.workers.delete(worker)) {
+      return;
+    }
+    this.idleWorkers = this.idleWorkers.filter((idleWorker) => idleWorker !== worker);
+
+    const request = this.workerRequests.get(worker);
+    if (request) {
+      logger.error('Python preprocessing worker stopped with a request in flight', {
+        category: 'preprocessing',
+        error: error.message,
+      });
+      request.settle(error);
+    }
+
+    const waiter = this.workerWaiters.shift();
+    if (waiter) {
+      waiter(this.startWorker());
+    }
+  }
+
+  /**
+   * Stop the long-running Python workers, letting them finish in-flight requests.
+   * Resolves once every worker has exited
+   */
+  stopWorkers() {
+    return Promise.all(Array.from(this.workers, (worker) => new Promise((resolve) => {
+      worker.once('exit', resolve);
+      worker.once('error', resolve);
+      worker.stdin.end();
+    })));
+  }
+
+  /**
+   * Map Python processor output to the service result format
+   */
+  formatProcessorResult(result) {
+    return {
+      success: true,
+      inputPath: result.input_path,
+      outputPath: result.output_path,
+      originalSize: result.original_size,
+      processedSize: result.processed_size,
+      processingTime: result.processing_time,
+      fileSizeBefore: result.file_size_before,
+      fileSizeAfter: result.file_size_after,
+      preprocessingApplied: result.preprocessing_applied,
+      qualityMetrics: result.quality_metrics,
+      timestamp: result.timestamp,
+    };
+  }
+
   /**
    * Batch preprocess multiple images
    */
@@ -391,6 +603,7 @@ class ImagePreprocessingService {
       ...this.stats,
       queueLength: this.processingQueue.length,
       activeProcessing: this.activeProcessing,
+      workers: this.workers.size,
       config: {
         maxConcurrentProcessing: this.config.maxConcurrentProcessing,
         timeout: this.config.timeout,
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the NVIDIA DALI preprocessing backend
+
+The DALI graph runs with CPU operators (dali_device_id None), so these need
+DALI but no GPU. They are skipped when DALI is not installed.
+
+Usage:
+    python -m unittest test_dali_pipeline
+"""
+
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import cv2
+from PIL import Image
+
+from dali_pipeline import DALI_AVAILABLE
+from image_processor import CropImageProcessor, EXIF_ORIENTATION
+
+def _encode_jpeg(rgb: np.ndarray, orientation: int = 1) -> bytes:
+    """Encode an RGB array as a JPEG, optionally tagged with an EXIF orientation"""
+    exif = Image.Exif()
+    if orientation != 1:
+        exif[EXIF_ORIENTATION] = orientation
+    buffer = io.BytesIO()
+    Image.fromarray(rgb).save(buffer, format='JPEG', quality=95, exif=exif)
+    return buffer.getvalue()
+
+def _cast_image(width: int = 640, height: int = 480) -> np.ndarray:
+    """Textured RGB image with a strong warm color cast"""
+    rng = np.random.default_rng(0)
+    noise = rng.normal(0, 20, (height, width, 1))
+    means = np.array([170.0, 110.0, 60.0])
+    return np.clip(means + noise, 0, 255).astype(np.uint8)
+
+@unittest.skipUnless(DALI_AVAILABLE, "NVIDIA DALI is not installed")
+class DALIPipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _processor(self, **config) -> CropImageProcessor:
+        return CropImageProcessor({
+            'backend': 'cuda_dali',
+            'dali_device_id': None,
+            'dali_batch_size': 4,
+            **config
+        })
+
+    def _write(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_process_image_resizes_and_reports_original_size(self):
+        processor = self._processor()
+        input_path = self._write('leaf.jpg', _encode_jpeg(_cast_image(640, 480)))
+        output_path = os.path.join(self.temp_dir.name, 'leaf_out.jpg')
+
+        result = processor.process_image(input_path, output_path)
+
+        self.assertTrue(result['success'], result.get('error'))
+        self.assertEqual(result['original_size'], (640, 480))
+        self.assertEqual(result['processed_size'], (512, 512))
+        self.assertEqual(cv2.imread(output_path).shape, (512, 512, 3))
+
+    def test_color_correction_matches_cpu_white_balance(self):
+        # Only white balance enabled, so the result can be compared with the
+        # CPU gray-world step applied to the same resized image
+        config = {
+            'contrast_enhancement': 1.0,
+            'sharpness_enhancement': 1.0,
+            'noise_reduction': False
+        }
+        processor = self._processor(**config)
+        rgb = _cast_image()
+
+        processed, _ = processor._gpu_pipeline.process([_encode_jpeg(rgb)])[0]
+
+        cpu = CropImageProcessor({**config, 'auto_crop': False})
+        decoded = cv2.imdecode(np.frombuffer(_encode_jpeg(rgb), np.uint8), cv2.IMREAD_COLOR)
+        expected = cpu._correct_colors(cpu._smart_resize(decoded))
+
+        gpu_means = processed.reshape(-1, 3).mean(axis=0)
+        cpu_means = expected.reshape(-1, 3).mean(axis=0)
+        np.testing.assert_allclose(gpu_means, cpu_means, atol=3.0)
+
+        # The cast is reduced, not just preserved
+        original_means = decoded.reshape(-1, 3).mean(axis=0)
+        self.assertLess(np.ptp(gpu_means), np.ptp(original_means))
+
+    def test_exif_orientation_is_applied(self):
+        processor = self._processor(
+            contrast_enhancement=1.0, sharpness_enhancement=1.0,
+            noise_reduction=False, color_correction=False
+        )
+        # Stored landscape with a red top half; orientation 6 displays it
+        # rotated 90 degrees clockwise, putting the red half on the right
+        rgb = np.zeros((480, 640, 3), np.uint8)
+        rgb[:240] = (220, 30, 30)
+        rgb[240:] = (30, 30, 220)
+
+        processed, original_size = processor._gpu_pipeline.process([_encode_jpeg(rgb, orientation=6)])[0]
+
+        self.assertEqual(original_size, (480, 640))
+        left, right = processed[:, :200].reshape(-1, 3).mean(axis=0), processed[:, -200:].reshape(-1, 3).mean(axis=0)
+        # BGR: red is channel 2, blue is channel 0
+        self.assertGreater(right[2], right[0])
+        self.assertGreater(left[0], left[2])
+
+    def test_batch_fails_only_undecodable_images(self):
+        processor = self._processor()
+        input_paths = [
+            self._write('good_1.jpg', _encode_jpeg(_cast_image())),
+            self._write('broken.jpg', b'not a jpeg'),
+            self._write('good_2.jpg', _encode_jpeg(_cast_image(800, 600)))
+        ]
+        output_paths = [os.path.join(self.temp_dir.name, f'out_{i}.jpg') for i in range(3)]
+
+        results = processor.process_batch(input_paths, output_paths)
+
+        self.assertEqual([result['success'] for result in results], [True, False, True])
+        self.assertEqual(results[2]['original_size'], (800, 600))
+
+    def test_tensors_are_chw_float16(self):
+        processor = self._processor()
+        input_path = self._write('leaf.jpg', _encode_jpeg(_cast_image()))
+
+        batches = processor.preprocess_tensors([input_path, input_path])
+
+        tensors = np.array(batches[0].as_tensor())
+        self.assertEqual(tensors.dtype, np.float16)
+        self.assertEqual(tensors.shape, (2, 3, 512, 512))
+        self.assertGreaterEqual(tensors.min(), 0.0)
+        self.assertLessEqual(tensors.max(), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
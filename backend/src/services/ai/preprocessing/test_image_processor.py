@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for the CPU batch, directory and worker modes of the image processor
+
+Each test runs on a few tiny generated images, so no GPU or optional
+accelerator is needed.
+
+Usage:
+    python -m unittest test_image_processor
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import cv2
+
+from image_processor import CropImageProcessor, process_directory, serve
+
+def _leaf_image(width: int = 96, height: int = 64) -> np.ndarray:
+    """Textured BGR image with a green blob on a brown background"""
+    rng = np.random.default_rng(width * height)
+    image = np.clip(np.array([60.0, 90.0, 120.0]) + rng.normal(0, 15, (height, width, 3)), 0, 255)
+    cv2.ellipse(image, (width // 2, height // 2), (width // 3, height // 3), 0, 0, 360, (40, 160, 60), -1)
+    return image.astype(np.uint8)
+
+class ProcessorTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.temp_dir.name, *parts)
+
+    def _write_image(self, name: str, width: int = 96, height: int = 64) -> str:
+        path = self._path(name)
+        self.assertTrue(cv2.imwrite(path, _leaf_image(width, height)))
+        return path
+
+    def _write(self, name: str, data: bytes) -> str:
+        path = self._path(name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+class ProcessBatchTest(ProcessorTestCase):
+
+    def test_results_follow_input_order(self):
+        processor = CropImageProcessor({'batch_workers': 3})
+        sizes = [(96 + 8 * i, 64 + 4 * i) for i in range(6)]
+        input_paths = [self._write_image(f'leaf_{i}.png', *size) for i, size in enumerate(sizes)]
+        output_paths = [self._path(f'out_{i}.jpg') for i in range(len(sizes))]
+
+        results = processor.process_batch(input_paths, output_paths)
+
+        self.assertEqual([result['input_path'] for result in results], input_paths)
+        self.assertEqual([result['original_size'] for result in results], sizes)
+        for output_path in output_paths:
+            self.assertEqual(cv2.imread(output_path).shape, (512, 512, 3))
+
+    def test_failures_are_isolated_and_counted(self):
+        processor = CropImageProcessor({'batch_workers': 2})
+        input_paths = [
+            self._write_image('good_1.png'),
+            self._path('missing.jpg'),
+            self._write('broken.jpg', b'not an image'),
+            self._write_image('good_2.png')
+        ]
+        output_paths = [self._path(f'out_{i}.jpg') for i in range(len(input_paths))]
+
+        results = processor.process_batch(input_paths, output_paths)
+
+        self.assertEqual([result['success'] for result in results], [True, False, False, True])
+        self.assertIn('not found', results[1]['error'])
+        self.assertFalse(os.path.exists(output_paths[1]))
+        self.assertFalse(os.path.exists(output_paths[2]))
+        self.assertEqual(processor.stats['processed_count'], 2)
+        self.assertEqual(processor.stats['error_count'], 2)
+
+    def test_empty_batch(self):
+        processor = CropImageProcessor()
+
+        self.assertEqual(processor.process_batch([], []), [])
+        self.assertEqual(processor.stats['processed_count'], 0)
+        self.assertEqual(processor.stats['error_count'], 0)
+
+    def test_mismatched_lengths_are_rejected(self):
+        processor = CropImageProcessor()
+
+        with self.assertRaises(ValueError):
+            processor.process_batch([self._path('a.jpg')], [])
+
+class ProcessDirectoryTest(ProcessorTestCase):
+
+    def test_same_stem_with_different_extensions_get_distinct_outputs(self):
+        input_dir, output_dir = self._path('in'), self._path('out')
+        os.makedirs(input_dir)
+        os.makedirs(output_dir)
+        self._write_image(os.path.join('in', 'leaf.jpg'))
+        self._write_image(os.path.join('in', 'leaf.png'), 128, 80)
+        self._write(os.path.join('in', 'notes.txt'), b'not an image')
+
+        report = process_directory(input_dir, output_dir, workers=2)
+
+        self.assertTrue(report['success'])
+        self.assertEqual(report['summary'], {'total': 2, 'successful': 2, 'failed': 0})
+        self.assertEqual(sorted(os.listdir(output_dir)), ['leaf_jpg_processed.jpg', 'leaf_png_processed.jpg'])
+        sizes = {os.path.basename(result['output_path']): result['original_size'] for result in report['results']}
+        self.assertEqual(sizes, {'leaf_jpg_processed.jpg': (96, 64), 'leaf_png_processed.jpg': (128, 80)})
+
+    def test_failed_images_are_reported_in_the_summary(self):
+        input_dir, output_dir = self._path('in'), self._path('out')
+        os.makedirs(input_dir)
+        os.makedirs(output_dir)
+        self._write_image(os.path.join('in', 'good.png'))
+        self._write(os.path.join('in', 'broken.jpg'), b'not an image')
+
+        report = process_directory(input_dir, output_dir, workers=1)
+
+        self.assertFalse(report['success'])
+        self.assertEqual(report['summary'], {'total': 2, 'successful': 1, 'failed': 1})
+
+class ServeTest(ProcessorTestCase):
+
+    def _serve(self, *lines: str) -> list:
+        output_stream = io.StringIO()
+        serve(input_stream=io.StringIO(''.join(line + '\n' for line in lines)), output_stream=output_stream)
+        return [json.loads(line) for line in output_stream.getvalue().splitlines()]
+
+    def test_results_echo_request_ids(self):
+        input_path = self._write_image('leaf.png')
+        output_path = self._path('leaf_out.jpg')
+
+        results = self._serve(
+            json.dumps({'id': 7, 'input': input_path, 'output': output_path}),
+            '',
+            json.dumps({'input': input_path, 'output': output_path})
+        )
+
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['id'], 7)
+        self.assertTrue(results[0]['success'], results[0].get('error'))
+        self.assertEqual(results[0]['processed_size'], [512, 512])
+        self.assertIsInstance(results[0]['quality_metrics']['brightness'], float)
+        self.assertNotIn('id', results[1])
+
+    def test_invalid_requests_do_not_stop_the_loop(self):
+        input_path = self._write_image('leaf.png')
+
+        results = self._serve(
+            'not json',
+            json.dumps(['a', 'list']),
+            json.dumps({'id': 'no-output', 'input': input_path}),
+            json.dumps({'id': 'ok', 'input': input_path, 'output': self._path('leaf_out.jpg')})
+        )
+
+        self.assertEqual([result['success'] for result in results], [False, False, False, True])
+        self.assertTrue(all(result['error'].startswith('Invalid request') for result in results[:3]))
+        self.assertNotIn('id', results[1])
+        self.assertEqual(results[2]['id'], 'no-output')
+        self.assertEqual(results[3]['id'], 'ok')
+
+    def test_processor_errors_do_not_stop_the_loop(self):
+        input_path = self._write_image('leaf.png')
+
+        results = self._serve(
+            json.dumps({'id': 1, 'input': self._path('missing.jpg'), 'output': self._path('missing_out.jpg')}),
+            json.dumps({'id': 2, 'input': input_path, 'output': self._path('leaf_out.jpg')})
+        )
+
+        self.assertEqual([result['id'] for result in results], [1, 2])
+        self.assertFalse(results[0]['success'])
+        self.assertIn('not found', results[0]['error'])
+        self.assertTrue(results[1]['success'], results[1].get('error'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,238 @@
+const os = require('os');
+const path = require('path');
+const { EventEmitter } = require('events');
+const { PassThrough } = require('stream');
+
+// Mock the database
+jest.mock('../src/config/database', () => ({
+  initializeDatabase: jest.fn().mockResolvedValue(true),
+  runQuery: jest.fn(),
+  getQuery: jest.fn(),
+  allQuery: jest.fn()
+}));
+
+jest.mock('../src/middleware/logger', () => ({
+  logger: {
+    info: jest.fn(),
+    debug: jest.fn(),
+    warn: jest.fn(),
+    error: jest.fn()
+  }
+}));
+
+jest.mock('child_process', () => ({
+  spawn: jest.fn()
+}));
+
+const { spawn } = require('child_process');
+const ImagePreprocessingService = require('../src/services/ai/preprocessing/preprocessingService');
+
+// Stand-in for a Python process: records the JSON-line requests written to
+// stdin and lets the test write results back on stdout
+class FakeProcess extends EventEmitter {
+  constructor() {
+    super();
+    this.stdin = new PassThrough();
+    this.stdout = new PassThrough();
+    this.stderr = new PassThrough();
+    this.requests = [];
+    this.kill = jest.fn(() => {
+      setImmediate(() => this.emit('exit', null, 'SIGTERM'));
+    });
+
+    let buffered = '';
+    this.stdin.on('data', (data) => {
+      buffered += data.toString();
+      const lines = buffered.split('\n');
+      buffered = lines.pop();
+      lines.forEach((line) => this.requests.push(JSON.parse(line)));
+    });
+  }
+
+  respond(request, fields = {}) {
+    this.stdout.write(`${JSON.stringify({
+      id: request.id,
+      success: true,
+      input_path: request.input,
+      output_path: request.output,
+      processed_size: [512, 512],
+      ...fields
+    })}\n`);
+  }
+}
+
+const flush = () => new Promise((resolve) => setImmediate(resolve));
+
+const waitFor = async (condition) => {
+  for (let attempt = 0; attempt < 100 && !condition(); attempt++) {
+    await flush();
+  }
+  expect(condition()).toBe(true);
+};
+
+describe('Image Preprocessing Service', () => {
+  let processes;
+  let service;
+
+  const createService = (config = {}) => new ImagePreprocessingService({
+    pythonExecutable: 'python3',
+    tempDir: path.join(os.tmpdir(), 'cropguard-test-temp'),
+    processedDir: path.join(os.tmpdir(), 'cropguard-test-processed'),
+    maxConcurrentProcessing: 2,
+    ...config
+  });
+
+  const processImage = (name) => service.processImageWithPython(`/in/${name}.jpg`, `/out/${name}.jpg`, {});
+
+  beforeEach(() => {
+    jest.clearAllMocks();
+    processes = [];
+    spawn.mockImplementation(() => {
+      const fakeProcess = new FakeProcess();
+      processes.push(fakeProcess);
+      return fakeProcess;
+    });
+  });
+
+  describe('persistent worker pool', () => {
+    it('should reuse a worker for sequential requests', async () => {
+      service = createService();
+
+      const first = processImage('a');
+      await waitFor(() => processes[0] && processes[0].requests.length === 1);
+      processes[0].respond(processes[0].requests[0]);
+      await expect(first).resolves.toMatchObject({ success: true, outputPath: '/out/a.jpg' });
+
+      const second = processImage('b');
+      await waitFor(() => processes[0].requests.length === 2);
+      processes[0].respond(processes[0].requests[1]);
+      await expect(second).resolves.toMatchObject({ success: true, outputPath: '/out/b.jpg' });
+
+      expect(spawn).toHaveBeenCalledTimes(1);
+      expect(spawn.mock.calls[0][1]).toContain('--serve');
+      expect(service.activeProcessing).toBe(0);
+    });
+
+    it('should run concurrent requests on separate workers', async () => {
+      service = createService();
+
+      const first = processImage('a');
+      const second = processImage('b');
+      await waitFor(() => processes.length === 2
+        && processes[0].requests.length === 1 && processes[1].requests.length === 1);
+
+      processes[1].respond(processes[1].requests[0]);
+      processes[0].respond(processes[0].requests[0]);
+
+      await expect(first).resolves.toMatchObject({ outputPath: '/out/a.jpg' });
+      await expect(second).resolves.toMatchObject({ outputPath: '/out/b.jpg' });
+      expect(service.getStatistics().workers).toBe(2);
+    });
+
+    it('should queue requests beyond the pool size for the next free worker', async () => {
+      service = createService({ maxConcurrentProcessing: 1, timeout: 200 });
+
+      const first = processImage('a');
+      const second = processImage('b');
+      await waitFor(() => processes[0] && processes[0].requests.length === 1);
+
+      // The second request's timeout only starts once it reaches the worker
+      await new Promise((resolve) => setTimeout(resolve, 150));
+      processes[0].respond(processes[0].requests[0]);
+      await expect(first).resolves.toMatchObject({ outputPath: '/out/a.jpg' });
+
+      await waitFor(() => processes[0].requests.length === 2);
+      await new Promise((resolve) => setTimeout(resolve, 100));
+      processes[0].respond(processes[0].requests[1]);
+      await expect(second).resolves.toMatchObject({ outputPath: '/out/b.jpg' });
+
+      expect(spawn).toHaveBeenCalledTimes(1);
+    });
+
+    it('should kill only the worker whose request timed out', async () => {
+      service = createService({ timeout: 150 });
+
+      const stuck = processImage('stuck');
+      await new Promise((resolve) => setTimeout(resolve, 75));
+      const healthy = processImage('healthy');
+      await waitFor(() => processes.length === 2 && processes[1].requests.length === 1);
+
+      // The healthy request is still in flight when the stuck worker is killed
+      await expect(stuck).rejects.toMatchObject({ statusCode: 408 });
+      expect(processes[0].kill).toHaveBeenCalled();
+      expect(processes[1].kill).not.toHaveBeenCalled();
+
+      processes[1].respond(processes[1].requests[0]);
+      await expect(healthy).resolves.toMatchObject({ outputPath: '/out/healthy.jpg' });
+
+      await waitFor(() => service.getStatistics().workers === 1);
+      expect(service.activeProcessing).toBe(0);
+    });
+
+    it('should fail the in-flight request and start a new worker after a crash', async () => {
+      service = createService();
+
+      const crashed = processImage('a');
+      await waitFor(() => processes[0] && processes[0].requests.length === 1);
+      processes[0].emit('exit', 1, null);
+      await expect(crashed).rejects.toThrow('worker exited');
+
+      const next = processImage('b');
+      await waitFor(() => processes[1] && processes[1].requests.length === 1);
+      processes[1].respond(processes[1].requests[0]);
+      await expect(next).resolves.toMatchObject({ outputPath: '/out/b.jpg' });
+      expect(spawn).toHaveBeenCalledTimes(2);
+    });
+
+    it('should reject processor errors and keep the worker', async () => {
+      service = createService();
+
+      const failed = processImage('a');
+      await waitFor(() => processes[0] && processes[0].requests.length === 1);
+      processes[0].respond(processes[0].requests[0], { success: false, error: 'Failed to load image' });
+      await expect(failed).rejects.toThrow('Preprocessing failed: Failed to load image');
+
+      const next = processImage('b');
+      await waitFor(() => processes[0].requests.length === 2);
+      processes[0].respond(processes[0].requests[1]);
+      await expect(next).resolves.toMatchObject({ success: true });
+      expect(spawn).toHaveBeenCalledTimes(1);
+    });
+
+    it('should close worker stdin on stop and resolve once they exit', async () => {
+      service = createService();
+
+      const first = processImage('a');
+      const second = processImage('b');
+      await waitFor(() => processes.length === 2
+        && processes[0].requests.length === 1 && processes[1].requests.length === 1);
+      processes.forEach((fakeProcess) => fakeProcess.respond(fakeProcess.requests[0]));
+      await Promise.all([first, second]);
+
+      let stopped = false;
+      const stopping = service.stopWorkers().then(() => { stopped = true; });
+      await flush();
+      expect(processes.every((fakeProcess) => fakeProcess.stdin.writableEnded)).toBe(true);
+      expect(stopped).toBe(false);
+
+      processes.forEach((fakeProcess) => fakeProcess.emit('exit', 0, null));
+      await stopping;
+      expect(service.getStatistics().workers).toBe(0);
+    });
+  });
+
+  describe('per-request processes', () => {
+    it('should spawn the processor for each request when the worker is disabled', async () => {
+      service = createService({ persistentWorker: false });
+
+      const result = processImage('a');
+      expect(spawn).toHaveBeenCalledTimes(1);
+      expect(spawn.mock.calls[0][1]).not.toContain('--serve');
+
+      processes[0].stdout.write(JSON.stringify({ success: true, output_path: '/out/a.jpg' }));
+      await flush();
+      processes[0].emit('close', 0);
+      await expect(result).resolves.toMatchObject({ success: true, outputPath: '/out/a.jpg' });
+    });
+  });
+});